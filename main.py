@@ -6,30 +6,163 @@ Automatically finds and processes unsubscribe links from mailing lists
 
 import os
 import re
-import pickle
+import sys
 import base64
+import binascii
+import heapq
 import requests
 import json
 import argparse
+import atexit
+from collections import Counter
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from urllib.parse import urlparse, parse_qs
-from typing import List, Dict, Optional, Tuple
+from email import message_from_bytes, policy
+from email.utils import parseaddr
+from urllib.parse import urlparse, urlsplit, parse_qs, unquote
+from typing import Callable, List, Dict, Optional, Tuple
 import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from googleapiclient.errors import HttpError
+
+try:
+    # Optional: google-re2 matches in linear time without backtracking
+    import re2 as body_regex
+except ImportError:
+    body_regex = re
 
 # Gmail API scopes
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly', 
           'https://www.googleapis.com/auth/gmail.modify']
 
+# Token file written by older versions, migrated to JSON on first run
+LEGACY_TOKEN_FILE = 'token.pickle'
+
+# Sub-requests per batch HTTP call; the endpoint allows 100, but Gmail
+# recommends at most 50 to avoid rate-limit errors
+BATCH_SIZE = 50
+
+# batchModify / batchDelete accept at most 1000 message IDs per call
+BATCH_MODIFY_SIZE = 1000
+
+# Retries (with exponential backoff) for Gmail API calls that hit 429/5xx
+API_RETRIES = 5
+
+# Gmail API request rate: steady-state requests per second and burst size
+API_RATE = 10.0
+API_BURST = 20
+
+# Socket timeout in seconds for Gmail API connections
+API_TIMEOUT = 30
+
+# Retries with backoff for batch sub-requests that fail with rate-limit or
+# server errors (single requests are retried by googleapiclient itself)
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 1.0
+RATE_LIMIT_BACKOFF_MAX = 32.0
+
+# Browser-like User-Agent; some unsubscribe pages reject unknown clients
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Number of unsubscribe URLs fetched concurrently, overall and per host
+UNSUBSCRIBE_WORKERS = 16
+UNSUBSCRIBE_PER_HOST = 4
+
+# URLs in angle brackets from a List-Unsubscribe header
+_UNSUB_HEADER_RE = re.compile(r'<(https?://[^>]+)>')
+_UNSUB_MAILTO_RE = re.compile(r'<(mailto:[^>]+)>', re.IGNORECASE)
+
+# Headers requested when only message metadata is needed
+METADATA_HEADERS = ['From', 'List-Unsubscribe', 'List-Unsubscribe-Post']
+
+# Partial-response masks so Gmail only returns the fields this script reads
+LIST_FIELDS = 'messages/id,nextPageToken'
+MESSAGE_FIELDS = {
+    'full': 'id,payload/headers(name,value),payload/parts,payload/body,payload/mimeType',
+    'metadata': 'id,internalDate,payload/headers(name,value)',
+    'raw': 'id,raw',
+}
+
+# messages.list returns at most 500 messages per page
+LIST_PAGE_SIZE = 500
+
+# Maps the URL-safe base64 alphabet Gmail uses onto the standard one
+_URLSAFE_TRANS = bytes.maketrans(b'-_', b'+/')
+
+# Unsubscribe history is saved after this many new records, and at exit
+HISTORY_FLUSH_INTERVAL = 25
+
+# Without --verbose, per-message loops report progress every this many emails
+PROGRESS_INTERVAL = 50
+
+# RFC 8058 one-click unsubscribe request body
+ONE_CLICK_BODY = 'List-Unsubscribe=One-Click'
+
+# Common unsubscribe link patterns in a message body, combined so the body
+# is scanned once: group 1 is an href value, group 2 a bare URL. Bytes
+# pattern so raw part data can be scanned without decoding it first.
+_BODY_UNSUB_RE_BYTES = body_regex.compile(
+    rb'(?i)(?:href=["\']([^"\']*(?:unsubscribe|opt[_-]?out)[^"\']*)["\']'
+    rb'|(https?://[^\s<>"]+(?:unsubscribe|opt[_-]?out|remove)[^\s<>"]*))'
+)
+
+def _urlsafe_b64decode(data: str) -> bytes:
+    """Decode Gmail's unpadded URL-safe base64 with a single binascii call"""
+    raw = data.encode('ascii').translate(_URLSAFE_TRANS)
+    return binascii.a2b_base64(raw + b'=' * (-len(raw) % 4))
+
+class TokenBucket:
+    """Token-bucket rate limiter: allows bursts up to capacity, refills at rate per second"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, n: int = 1):
+        """Take n tokens, sleeping until enough have been refilled"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            
+            if self.tokens < n:
+                time.sleep((n - self.tokens) / self.rate)
+                self.tokens = n
+                self.last_refill = time.monotonic()
+            
+            self.tokens -= n
+
+
+class SenderData:
+    """Emails grouped under one sender; slots keep per-sender overhead low"""
+    
+    __slots__ = ('name', 'email', 'messages', 'latest')
+    
+    def __init__(self, name: str, email: str):
+        self.name = name
+        self.email = email
+        self.messages: List[Dict] = []
+        self.latest: Optional[Dict] = None  # Most recent message, by internalDate
+    
+    def add(self, message: Dict):
+        """Add a message, keeping track of the most recent one"""
+        self.messages.append(message)
+        if self.latest is None or int(message.get('internalDate', 0)) > int(self.latest.get('internalDate', 0)):
+            self.latest = message
+
+
 class GmailUnsubscriber:
-    def __init__(self, credentials_file='credentials.json', token_file='token.pickle', 
-                 history_file='unsubscribe_history.json'):
+    def __init__(self, credentials_file='credentials.json', token_file='token.json', 
+                 history_file='unsubscribe_history.json', verbose: bool = False):
         """
         Initialize Gmail API client
         
@@ -37,23 +170,60 @@ class GmailUnsubscriber:
             credentials_file: Path to OAuth2 credentials JSON file
             token_file: Path to store authentication tokens
             history_file: Path to store unsubscribe history
+            verbose: If True, print a line for every email processed
         """
-        self.service = None
+        self._service = None  # Built on first use, see the service property
+        self.verbose = verbose
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.history_file = history_file
         self.unsubscribe_history = self.load_unsubscribe_history()
-        self.last_api_call = 0  # Rate limiting
-        self.authenticate()
+        self._history_dirty = False  # Unsaved history changes
+        self._unsaved_records = 0  # Records added since the last save
+        atexit.register(self.flush_unsubscribe_history)  # Keep history on Ctrl+C or errors
+        self._api_bucket = TokenBucket(API_RATE, API_BURST)  # Rate limiting
+        self._print_lock = threading.Lock()  # Keeps output from worker threads readable
+        self._host_lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}  # Host -> concurrency limit
+        self._label_cache: Dict[str, str] = {}  # Label name -> label ID
+        self._labels_listed = False  # Whether _label_cache holds all existing labels
+        
+        # Shared HTTP session so unsubscribe requests reuse connections. The
+        # Retry policy handles transient failures for idempotent requests and
+        # returns the last response once retries run out.
+        self._session = requests.Session()
+        self._session.headers.update({'User-Agent': USER_AGENT})
+        retries = Retry(total=3, backoff_factor=0.5,
+                        status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+    
+    @property
+    def service(self):
+        """Gmail API client, authenticating on first use"""
+        if self._service is None:
+            self.authenticate()
+        return self._service
     
     def authenticate(self):
         """Authenticate with Gmail API"""
+        # Imported here so --help and argument errors don't pay for the
+        # discovery/auth import graph
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.discovery import build
+        import httplib2
+        
         creds = None
         
+        self.migrate_legacy_token()
+        
         # Load existing token
         if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+            creds = Credentials.from_authorized_user_file(self.token_file, SCOPES)
         
         # If no valid credentials, get new ones
         if not creds or not creds.valid:
@@ -91,35 +261,67 @@ class GmailUnsubscriber:
                     raise
             
             # Save credentials for next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(self.token_file, 'w') as token:
+                token.write(creds.to_json())
         
-        self.service = build('gmail', 'v1', credentials=creds)
+        # One authorized keep-alive connection for every API call and batch
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=API_TIMEOUT))
+        self._service = build('gmail', 'v1', http=http, cache_discovery=False)
         print("✓ Authenticated with Gmail API")
     
+    def migrate_legacy_token(self):
+        """Convert a token.pickle from older versions to the JSON token file"""
+        if os.path.exists(self.token_file) or not os.path.exists(LEGACY_TOKEN_FILE):
+            return
+        
+        import pickle  # Only needed for this one-time migration
+        
+        try:
+            with open(LEGACY_TOKEN_FILE, 'rb') as token:
+                creds = pickle.load(token)
+            with open(self.token_file, 'w') as token:
+                token.write(creds.to_json())
+            os.remove(LEGACY_TOKEN_FILE)
+            print(f"✓ Migrated {LEGACY_TOKEN_FILE} to {self.token_file}")
+        except Exception as e:
+            print(f"Warning: Could not migrate {LEGACY_TOKEN_FILE}: {e}")
+    
     def load_unsubscribe_history(self) -> Dict:
         """Load unsubscribe history from JSON file"""
         if os.path.exists(self.history_file):
             try:
                 with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                    history = json.load(f)
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Could not load unsubscribe history from {self.history_file}: {e}")
                 return {}
+            
+            # Older files are keyed by the plain lowercased address; re-key them by
+            # canonical_sender_key, keeping the latest record when +tag variants merge
+            canonical_history = {}
+            for sender_key, record in history.items():
+                key = self.canonical_sender_key(sender_key)
+                existing = canonical_history.get(key)
+                if existing is None or record.get('timestamp', '') > existing.get('timestamp', ''):
+                    canonical_history[key] = record
+            return canonical_history
         return {}
     
     def save_unsubscribe_history(self):
         """Save unsubscribe history to JSON file"""
         try:
-            with open(self.history_file, 'w') as f:
+            # Write a temporary file and swap it in, so an interrupted save
+            # never leaves a truncated history behind
+            temp_file = f"{self.history_file}.tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(self.unsubscribe_history, f, indent=2, default=str)
+            os.replace(temp_file, self.history_file)
         except IOError as e:
             print(f"Warning: Could not save unsubscribe history to {self.history_file}: {e}")
     
-    def add_to_unsubscribe_history(self, sender_email: str, sender_name: str, 
+    def add_to_unsubscribe_history(self, sender_key: str, sender_email: str, sender_name: str,
                                   success: bool, unsubscribe_url: str = None):
-        """Add a sender to the unsubscribe history"""
-        sender_key = sender_email.lower().strip()
+        """Add a sender, by the key from get_sender_info, to the unsubscribe history"""
         self.unsubscribe_history[sender_key] = {
             'sender_name': sender_name,
             'sender_email': sender_email,
@@ -128,26 +330,118 @@ class GmailUnsubscriber:
             'timestamp': datetime.now().isoformat(),
             'unsubscribe_url': unsubscribe_url
         }
-        self.save_unsubscribe_history()
+        # Saved in batches by flush_unsubscribe_history rather than per sender
+        self._history_dirty = True
+        self._unsaved_records += 1
+        if self._unsaved_records >= HISTORY_FLUSH_INTERVAL:
+            self.flush_unsubscribe_history()
+    
+    def flush_unsubscribe_history(self):
+        """Save unsubscribe history if it changed since the last save"""
+        if self._history_dirty:
+            self.save_unsubscribe_history()
+            self._history_dirty = False
+            self._unsaved_records = 0
+    
+    def _is_rate_limit_error(self, error: HttpError) -> bool:
+        """
+        Check whether a Gmail API error is a short-term rate limit
+        
+        quotaExceeded is a daily quota and won't recover by backing off, so
+        it doesn't count.
+        """
+        if error.resp.status == 429:
+            return True
+        content = error.content.decode('utf-8', errors='ignore') if error.content else ''
+        return 'rateLimitExceeded' in content or 'userRateLimitExceeded' in content
     
-    def is_already_unsubscribed(self, sender_email: str) -> bool:
-        """Check if we've already attempted to unsubscribe from this sender"""
-        sender_key = sender_email.lower().strip()
-        return sender_key in self.unsubscribe_history
+    def _is_retryable_error(self, error: Exception) -> bool:
+        """Check whether a failed batch sub-request is worth retrying (rate limit or 5xx)"""
+        return isinstance(error, HttpError) and (
+            error.resp.status >= 500 or self._is_rate_limit_error(error))
     
-    def get_unsubscribe_record(self, sender_email: str) -> Optional[Dict]:
-        """Get the unsubscribe record for a sender"""
-        sender_key = sender_email.lower().strip()
-        return self.unsubscribe_history.get(sender_key)
+    def _backoff_delay(self, attempt: int) -> float:
+        """Capped exponential backoff with jitter for the given retry attempt"""
+        delay = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** attempt)
+        return delay + random.uniform(0, RATE_LIMIT_BACKOFF_BASE)
     
-    def rate_limit_api_call(self, min_delay: float = 0.1):
-        """Ensure minimum delay between API calls to prevent throttling"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_api_call
-        if time_since_last < min_delay:
-            sleep_time = min_delay - time_since_last
-            time.sleep(sleep_time)
-        self.last_api_call = time.time()
+    def _execute(self, request):
+        """
+        Execute a Gmail API request under the rate limiter
+        
+        googleapiclient retries 429, 5xx and 403 rate-limit responses with
+        exponential backoff, up to API_RETRIES times; any error left after
+        that is raised to the caller.
+        """
+        self._api_bucket.acquire()
+        return request.execute(num_retries=API_RETRIES)
+    
+    def _list_request(self, query: str, max_results: int, page_token: Optional[str] = None):
+        """Build a messages.list request for one page of results"""
+        return self.service.users().messages().list(
+            userId='me', q=query, maxResults=min(LIST_PAGE_SIZE, max_results),
+            pageToken=page_token, fields=LIST_FIELDS)
+    
+    def list_first_pages(self, queries: List[str], max_results: int) -> Dict[str, Dict]:
+        """
+        Fetch the first page of results for several queries in one batch request
+        
+        Args:
+            queries: Gmail search queries
+            max_results: Maximum number of messages per page
+            
+        Returns:
+            Dictionary mapping query to its messages.list response (failed queries are left out)
+        """
+        results = {}
+        
+        def handle_response(request_id, response, exception):
+            query = queries[int(request_id)]
+            if exception is not None:
+                print(f"    ⚠️  Error searching {query}: {exception}")
+            else:
+                results[query] = response
+        
+        try:
+            batch = self.service.new_batch_http_request(callback=handle_response)
+            for i, query in enumerate(queries):
+                batch.add(self._list_request(query, max_results), request_id=str(i))
+            # A batch costs as much rate limit as its sub-requests
+            self._api_bucket.acquire(len(queries))
+            batch.execute()
+        except Exception as e:
+            # Fall back to one request per query if the batch call itself fails
+            print(f"Batch search failed ({e}), searching each location individually...")
+            for query in queries:
+                if query not in results:
+                    try:
+                        results[query] = self._execute(self._list_request(query, max_results))
+                    except Exception as e:
+                        print(f"    ⚠️  Error searching {query}: {e}")
+        
+        return results
+    
+    def iter_message_ids(self, query: str, max_results: int):
+        """
+        Yield message stubs matching the query, following nextPageToken
+        
+        Args:
+            query: Gmail search query
+            max_results: Maximum number of messages to yield
+        """
+        fetched = 0
+        page_token = None
+        
+        while fetched < max_results:
+            results = self._execute(self._list_request(query, max_results - fetched, page_token))
+            
+            messages = results.get('messages', [])
+            fetched += len(messages)
+            yield from messages
+            
+            page_token = results.get('nextPageToken')
+            if not page_token or not messages:
+                break
     
     def search_emails(self, query: str, max_results: int = 100, inbox_only: bool = True) -> List[Dict]:
         """
@@ -162,42 +456,61 @@ class GmailUnsubscriber:
             List of email message dictionaries
         """
         try:
-            all_messages = []
-            
             if inbox_only and "in:" not in query.lower():
                 # Search across all inbox-like locations to match web UI behavior
                 inbox_locations = ['in:inbox', 'in:primary', 'in:social', 'in:promotions', 'in:updates']
+                location_queries = [f"{location} {query}" for location in inbox_locations]
                 
                 print(f"🔍 Searching inbox categories for: '{query}'")
-                print(f"📊 Max results per category: {max_results}")
-                
-                for location in inbox_locations:
-                    location_query = f"{location} {query}"
-                    print(f"  Searching {location}...")
-                    
-                    try:
-                        results = self.service.users().messages().list(
-                            userId='me', q=location_query, maxResults=max_results//len(inbox_locations) + 10).execute()
-                        
-                        messages = results.get('messages', [])
-                        if messages:
-                            print(f"    ✅ Found {len(messages)} emails in {location}")
-                            all_messages.extend(messages)
-                        else:
-                            print(f"    📭 No emails in {location}")
-                            
-                    except Exception as e:
-                        print(f"    ⚠️  Error searching {location}: {e}")
+                print(f"📊 Max results: {max_results}")
                 
-                # Remove duplicates based on message ID
+                # Remove duplicates based on message ID as results come in
                 unique_messages = []
                 seen_ids = set()
-                for msg in all_messages:
-                    if msg['id'] not in seen_ids:
-                        unique_messages.append(msg)
-                        seen_ids.add(msg['id'])
                 
-                messages = unique_messages[:max_results]
+                def add_unique(messages):
+                    for msg in messages:
+                        if len(unique_messages) >= max_results:
+                            break
+                        if msg['id'] not in seen_ids:
+                            seen_ids.add(msg['id'])
+                            unique_messages.append(msg)
+                
+                # First page of every location in a single batch request
+                first_pages = self.list_first_pages(location_queries, max_results)
+                
+                for location, location_query in zip(inbox_locations, location_queries):
+                    if len(unique_messages) >= max_results:
+                        break
+                    if location_query not in first_pages:
+                        continue
+                    
+                    results = first_pages[location_query]
+                    messages = results.get('messages', [])
+                    if not messages:
+                        print(f"  📭 No emails in {location}")
+                        continue
+                    
+                    found_count = len(messages)
+                    add_unique(messages)
+                    
+                    # Only locations with more results than the first page are paginated
+                    page_token = results.get('nextPageToken')
+                    while page_token and len(unique_messages) < max_results:
+                        try:
+                            results = self._execute(self._list_request(
+                                location_query, max_results - len(unique_messages), page_token))
+                        except Exception as e:
+                            print(f"    ⚠️  Error searching {location}: {e}")
+                            break
+                        messages = results.get('messages', [])
+                        found_count += len(messages)
+                        add_unique(messages)
+                        page_token = results.get('nextPageToken')
+                    
+                    print(f"  ✅ Found {found_count} emails in {location}")
+                
+                messages = unique_messages
                 print(f"Found {len(messages)} total unique emails across inbox categories")
                 
             else:
@@ -205,10 +518,7 @@ class GmailUnsubscriber:
                 print(f"🔍 Searching with query: '{query}'")
                 print(f"📊 Max results: {max_results}")
                 
-                results = self.service.users().messages().list(
-                    userId='me', q=query, maxResults=max_results).execute()
-                
-                messages = results.get('messages', [])
+                messages = list(self.iter_message_ids(query, max_results))
                 print(f"Found {len(messages)} emails matching query: {query}")
             
             return messages
@@ -218,17 +528,102 @@ class GmailUnsubscriber:
             print(f"Exception details: {type(e).__name__}: {str(e)}")
             return []
     
-    def get_message_details(self, message_id: str) -> Optional[Dict]:
-        """Get full message details including headers and body"""
+    def _message_get_request(self, message_id: str, fmt: str = 'full',
+                             metadata_headers: Optional[List[str]] = None):
+        """Build a messages.get request for the given format"""
+        kwargs = {'userId': 'me', 'id': message_id, 'format': fmt}
+        if fmt in MESSAGE_FIELDS:
+            kwargs['fields'] = MESSAGE_FIELDS[fmt]
+        if fmt == 'metadata' and metadata_headers:
+            kwargs['metadataHeaders'] = metadata_headers
+        return self.service.users().messages().get(**kwargs)
+    
+    def get_message_details(self, message_id: str, fmt: str = 'full',
+                            metadata_headers: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Get message details
+        
+        Args:
+            message_id: Gmail message ID
+            fmt: Gmail message format ('full' includes the body, 'metadata' headers only,
+                 'raw' the RFC 822 source)
+            metadata_headers: Headers to return when fmt is 'metadata'
+            
+        Returns:
+            Gmail message object, or None on error
+        """
         try:
-            self.rate_limit_api_call()
-            message = self.service.users().messages().get(
-                userId='me', id=message_id, format='full').execute()
-            return message
+            request = self._message_get_request(message_id, fmt, metadata_headers)
+            return self._execute(request)
         except Exception as e:
             print(f"Error getting message {message_id}: {e}")
             return None
     
+    def get_message_raw(self, message_id: str) -> Optional[Dict]:
+        """Get the RFC 822 source of a message, for scanning its body"""
+        return self.get_message_details(message_id, fmt='raw')
+    
+    def get_messages_batch(self, message_ids: List[str], fmt: str = 'full',
+                           metadata_headers: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Fetch many messages using Gmail's batch endpoint
+        
+        Args:
+            message_ids: List of Gmail message IDs to fetch
+            fmt: Gmail message format ('full' includes the body, 'metadata' headers only)
+            metadata_headers: Headers to return when fmt is 'metadata'
+            
+        Returns:
+            Dictionary mapping message ID to message details
+        """
+        results = {}
+        retry_ids = []  # Sub-requests that failed with a rate-limit or server error
+        
+        def handle_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif self._is_retryable_error(exception):
+                retry_ids.append(request_id)
+            else:
+                print(f"Error getting message {request_id}: {exception}")
+        
+        for start in range(0, len(message_ids), BATCH_SIZE):
+            chunk = message_ids[start:start + BATCH_SIZE]
+            
+            # Only the failed sub-requests of a batch are retried, in a smaller batch
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                retry_ids.clear()
+                try:
+                    batch = self.service.new_batch_http_request(callback=handle_response)
+                    for message_id in chunk:
+                        batch.add(self._message_get_request(message_id, fmt, metadata_headers),
+                                  request_id=message_id)
+                    # A batch costs as much rate limit as its sub-requests
+                    self._api_bucket.acquire(len(chunk))
+                    batch.execute()
+                except Exception as e:
+                    # Fall back to one request per message if the batch call itself fails
+                    print(f"Batch request failed ({e}), fetching messages individually...")
+                    for message_id in chunk:
+                        if message_id not in results:
+                            message = self.get_message_details(message_id, fmt, metadata_headers)
+                            if message:
+                                results[message_id] = message
+                    break
+                
+                if not retry_ids:
+                    break
+                if attempt == RATE_LIMIT_RETRIES:
+                    print(f"Giving up on {len(retry_ids)} messages after {attempt} retries")
+                    break
+                
+                chunk = list(retry_ids)
+                delay = self._backoff_delay(attempt)
+                print(f"  {len(chunk)} messages were rate limited or failed, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+        
+        return results
+    
     def extract_unsubscribe_links(self, message: Dict) -> List[str]:
         """
         Extract unsubscribe links from email headers and body
@@ -248,151 +643,354 @@ class GmailUnsubscriber:
                 # Extract URLs from List-Unsubscribe header
                 header_value = header['value']
                 # Look for URLs in angle brackets
-                urls = re.findall(r'<(https?://[^>]+)>', header_value)
+                urls = _UNSUB_HEADER_RE.findall(header_value)
                 unsubscribe_links.extend(urls)
         
-        # Extract from email body
-        body_text = self.get_message_body(message)
-        if body_text:
-            # Common unsubscribe link patterns
-            patterns = [
-                r'https?://[^\s<>"]+unsubscribe[^\s<>"]*',
-                r'https?://[^\s<>"]+opt[_-]?out[^\s<>"]*',
-                r'https?://[^\s<>"]+remove[^\s<>"]*',
-                r'href=["\']([^"\']*unsubscribe[^"\']*)["\']',
-                r'href=["\']([^"\']*opt[_-]?out[^"\']*)["\']'
-            ]
+        # Most bulk mail carries a List-Unsubscribe header; skip the body when it does
+        cleaned_links = self._clean_unsubscribe_links(unsubscribe_links)
+        if cleaned_links:
+            return cleaned_links
+        
+        # Extract from email body, one part at a time, stopping at the first match
+        for part_data in self._iter_body_bytes(message):
+            # Only the (short) matched URLs are decoded, never the whole part
+            body_links = [(href_link or url_link).decode('utf-8', errors='ignore')
+                          for href_link, url_link in _BODY_UNSUB_RE_BYTES.findall(part_data)]
+            cleaned_links = self._clean_unsubscribe_links(body_links)
+            if cleaned_links:
+                return cleaned_links
+        
+        return []
+    
+    def find_unsubscribe_links(self, message: Dict) -> List[str]:
+        """
+        Find unsubscribe links for a message fetched with headers only
+        
+        The List-Unsubscribe header is usually enough; the raw message is only
+        fetched to scan its body when the header has no HTTP link.
+        
+        Args:
+            message: Gmail message (headers at least)
             
-            for pattern in patterns:
-                matches = re.findall(pattern, body_text, re.IGNORECASE)
-                unsubscribe_links.extend(matches)
+        Returns:
+            List of unsubscribe URLs
+        """
+        links = self.extract_unsubscribe_links(message)
+        if not links:
+            # The headers were checked above, so only the body is needed; the
+            # stdlib parser undoes the transfer encodings of the raw source
+            raw_message = self.get_message_raw(message['id'])
+            if raw_message:
+                links = self.extract_unsubscribe_links(raw_message)
+        return links
+    
+    def extract_mailto_links(self, message: Dict) -> List[str]:
+        """
+        Extract mailto: unsubscribe addresses from the List-Unsubscribe header
         
-        # Remove duplicates and clean URLs
-        unique_links = list(set(unsubscribe_links))
-        cleaned_links = []
+        Args:
+            message: Gmail message object
+            
+        Returns:
+            List of mailto: URIs
+        """
+        mailto_links = []
+        
+        headers = message.get('payload', {}).get('headers', [])
+        for header in headers:
+            if header['name'].lower() == 'list-unsubscribe':
+                mailto_links.extend(_UNSUB_MAILTO_RE.findall(header['value']))
+        
+        return list(dict.fromkeys(mailto_links))
+    
+    def is_one_click_unsubscribe(self, message: Dict) -> bool:
+        """
+        Check whether the List-Unsubscribe URL supports RFC 8058 one-click POST
+        
+        Args:
+            message: Gmail message object
+            
+        Returns:
+            True if List-Unsubscribe has an http(s) URL and List-Unsubscribe-Post
+            advertises one-click unsubscribe
+        """
+        has_header_url = False
+        has_one_click = False
+        
+        headers = message.get('payload', {}).get('headers', [])
+        for header in headers:
+            name = header['name'].lower()
+            if name == 'list-unsubscribe' and _UNSUB_HEADER_RE.search(header['value']):
+                has_header_url = True
+            elif name == 'list-unsubscribe-post' and ONE_CLICK_BODY.lower() in header['value'].lower():
+                has_one_click = True
+        
+        return has_header_url and has_one_click
+    
+    def _is_http_url(self, link: str) -> bool:
+        """Check that a link is a well-formed http(s) URL"""
+        try:
+            return urlsplit(link).scheme.lower() in ('http', 'https')
+        except ValueError:
+            return False
+    
+    def _clean_unsubscribe_links(self, links: List[str]) -> List[str]:
+        """Remove duplicates and keep only http(s) URLs, preserving order"""
+        # dict keeps insertion order, so header URLs stay ahead of body URLs
+        cleaned_links = {}
         
-        for link in unique_links:
+        for link in links:
             # Clean up URLs
             link = link.strip('<>')
-            if link.startswith('http'):
-                cleaned_links.append(link)
+            if link not in cleaned_links and self._is_http_url(link):
+                cleaned_links[link] = None
         
-        return cleaned_links
+        return list(cleaned_links)
     
-    def get_message_body(self, message: Dict) -> str:
-        """Extract text content from email body"""
-        payload = message.get('payload', {})
-        body = ""
-        
-        def extract_text_from_part(part):
-            nonlocal body
-            if part.get('mimeType') == 'text/plain':
-                data = part.get('body', {}).get('data')
-                if data:
-                    body += base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-            elif part.get('mimeType') == 'text/html':
+    def _iter_body_bytes(self, message: Dict):
+        """Yield the raw decoded bytes of each text/plain and text/html part"""
+        if 'raw' in message:
+            # format='raw' message: let the stdlib parser undo transfer encodings
+            mime_message = message_from_bytes(_urlsafe_b64decode(message['raw']),
+                                              policy=policy.default)
+            for part in mime_message.walk():
+                if part.get_content_type() in ('text/plain', 'text/html'):
+                    data = part.get_payload(decode=True)
+                    if data:
+                        yield data
+            return
+        
+        # Walk the MIME tree with an explicit stack, in document order
+        stack = [message.get('payload', {})]
+        while stack:
+            part = stack.pop()
+            if part.get('mimeType') in ('text/plain', 'text/html'):
                 data = part.get('body', {}).get('data')
                 if data:
-                    body += base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+                    yield _urlsafe_b64decode(data)
             
             # Handle multipart messages
-            if 'parts' in part:
-                for subpart in part['parts']:
-                    extract_text_from_part(subpart)
+            stack.extend(reversed(part.get('parts', [])))
+    
+    def canonical_sender_key(self, sender_email: str) -> str:
+        """
+        Normalize a sender address for grouping and history lookups
         
-        extract_text_from_part(payload)
-        return body
+        The address is lowercased and any +tag is dropped from the local part,
+        so per-recipient variants like news+1234@example.com group together
+        as news@example.com.
+        """
+        address = sender_email.lower().strip().strip('<>')
+        local, at, domain = address.rpartition('@')
+        base = local.split('+', 1)[0]
+        if at and base and base != local:
+            address = f"{base}@{domain}"
+        return address
     
-    def get_sender_info(self, message: Dict) -> Tuple[str, str]:
-        """Extract sender name and email from message"""
+    def get_sender_info(self, message: Dict) -> Tuple[str, str, str]:
+        """
+        Extract sender name and email from message
+        
+        Returns:
+            Tuple of (sender name, sender email, normalized sender key)
+        """
         headers = message.get('payload', {}).get('headers', [])
         sender_name = "Unknown"
         sender_email = "unknown@example.com"
         
         for header in headers:
             if header['name'].lower() == 'from':
-                from_field = header['value']
-                # Parse "Name <email@domain.com>" format
-                match = re.match(r'(.*?)<([^>]+)>', from_field)
-                if match:
-                    sender_name = match.group(1).strip().strip('"')
-                    sender_email = match.group(2).strip()
-                else:
-                    sender_email = from_field.strip()
+                # Parse "Name <email@domain.com>" format (RFC 2822 aware)
+                name, address = parseaddr(header['value'])
+                sender_name = name or sender_name
+                sender_email = address or sender_email
                 break
         
-        return sender_name, sender_email
+        # Interned so repeated keys for the same sender share one string object
+        sender_key = sys.intern(self.canonical_sender_key(sender_email))
+        return sender_name, sender_email, sender_key
+    
+    def _progress(self, i: int, total: int, label: str = "email"):
+        """
+        Announce the item about to be processed
+        
+        Every item is shown in verbose mode; otherwise only the first, every
+        PROGRESS_INTERVAL-th and the last.
+        """
+        if self.verbose or i == 1 or i % PROGRESS_INTERVAL == 0 or i == total:
+            print(f"  Processing {label} {i}/{total}...")
     
-    def attempt_unsubscribe(self, url: str, sender_info: Tuple[str, str], max_retries: int = 2) -> bool:
+    def _log(self, lines: List[str]):
+        """Print a block of lines in one go, safe to call from worker threads"""
+        with self._print_lock:
+            print("\n".join(lines))
+    
+    def attempt_one_click_unsubscribe(self, url: str, log: Callable[[str], None] = print) -> bool:
         """
-        Attempt to unsubscribe via HTTP request with retry logic
+        Unsubscribe with a single RFC 8058 one-click POST
+        
+        Args:
+            url: List-Unsubscribe URL
+            log: Function called with each output line
+            
+        Returns:
+            True if the server accepted the request, False otherwise
+        """
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        
+        try:
+            response = self._session.post(url, data=ONE_CLICK_BODY, headers=headers, timeout=15)
+            response.close()
+            if response.status_code < 400:
+                log(f"  ✓ One-click unsubscribe accepted (HTTP {response.status_code})")
+                return True
+            log(f"  ✗ HTTP {response.status_code} - One-click unsubscribe rejected")
+        except requests.exceptions.RequestException as e:
+            log(f"  ✗ One-click unsubscribe failed: {e}")
+        except Exception as e:
+            log(f"  ✗ Unexpected error during one-click unsubscribe: {e}")
+        
+        return False
+    
+    def attempt_unsubscribe(self, url: str, sender_info: Tuple[str, str],
+                            one_click: bool = False) -> bool:
+        """
+        Attempt to unsubscribe via HTTP request
+        
+        Sends HEAD first so the confirmation page isn't downloaded; if that isn't
+        accepted, falls back to a streamed GET whose body is never read. Retries
+        for timeouts, connection errors and 429/5xx responses come from the
+        session's Retry policy. Output is printed as one block once the attempt
+        finishes, so attempts running in parallel don't interleave.
         
         Args:
             url: Unsubscribe URL
             sender_info: Tuple of (sender_name, sender_email)
-            max_retries: Maximum number of retry attempts
+            one_click: If True, try an RFC 8058 one-click POST before falling back to GET
             
         Returns:
             True if successful, False otherwise
         """
+        lines = []
+        try:
+            return self._attempt_unsubscribe(url, sender_info, one_click, lines.append)
+        finally:
+            self._log(lines)
+    
+    def _attempt_unsubscribe(self, url: str, sender_info: Tuple[str, str], one_click: bool,
+                             log: Callable[[str], None]) -> bool:
+        """attempt_unsubscribe's HTTP requests, reporting through log"""
+        sender_name, sender_email = sender_info
+        
+        if one_click:
+            log(f"  Attempting one-click unsubscribe from {sender_name} ({sender_email})")
+            log(f"  URL: {url}")
+            if self.attempt_one_click_unsubscribe(url, log):
+                return True
+            log(f"    Falling back to GET...")
+        
+        log(f"  Attempting unsubscribe from {sender_name} ({sender_email})")
+        log(f"  URL: {url}")
+        
+        try:
+            response = self._session.head(url, timeout=15, allow_redirects=True)
+            if response.status_code != 200:
+                # HEAD not allowed or not handled: GET, but only read the status
+                response = self._session.get(url, timeout=15, allow_redirects=True, stream=True)
+                response.close()
+        except requests.exceptions.Timeout as e:
+            log(f"  ✗ Request timeout: {e}")
+            return False
+        except requests.exceptions.ConnectionError as e:
+            log(f"  ✗ Connection error: {e}")
+            return False
+        except requests.exceptions.RequestException as e:
+            log(f"  ✗ Request failed: {e}")
+            return False
+        except Exception as e:
+            log(f"  ✗ Unexpected error: {e}")
+            return False
+        
+        if response.status_code == 200:
+            log(f"  ✓ Successfully accessed unsubscribe page")
+            return True
+        
+        log(f"  ✗ HTTP {response.status_code} - Failed to access unsubscribe page")
+        return False
+    
+    def send_mailto_unsubscribe(self, mailto_url: str, sender_info: Tuple[str, str]) -> bool:
+        """
+        Unsubscribe by sending the email requested by a mailto: List-Unsubscribe link
+        
+        Args:
+            mailto_url: mailto: URI, optionally with subject and body parameters
+            sender_info: Tuple of (sender_name, sender_email)
+            
+        Returns:
+            True if the email was sent, False otherwise
+        """
         sender_name, sender_email = sender_info
+        parsed = urlparse(mailto_url)
+        params = parse_qs(parsed.query)
+        
+        to_address = unquote(parsed.path)
+        
+        message = MIMEText(params.get('body', ['unsubscribe'])[0])
+        message['to'] = to_address
+        message['subject'] = params.get('subject', ['unsubscribe'])[0]
+        
+        print(f"  Sending unsubscribe email for {sender_name} ({sender_email})")
+        print(f"  To: {to_address}")
         
-        for attempt in range(max_retries + 1):
+        try:
+            raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+            self._execute(self.service.users().messages().send(
+                userId='me', body={'raw': raw}))
+            print(f"  ✓ Unsubscribe email sent")
+            return True
+        except Exception as e:
+            print(f"  ✗ Could not send unsubscribe email: {e}")
+            return False
+    
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent requests to the URL's host"""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(UNSUBSCRIBE_PER_HOST)
+            return self._host_semaphores[host]
+    
+    def attempt_unsubscribes(self, targets: Dict[str, Tuple[str, Tuple[str, str], bool]]) -> Dict[str, bool]:
+        """
+        Attempt several unsubscribes concurrently
+        
+        Args:
+            targets: Dictionary mapping sender key to (url, (sender_name, sender_email), one_click)
+            
+        Returns:
+            Dictionary mapping sender key to unsubscribe success
+        """
+        if not targets:
+            return {}
+        
+        print(f"\nAttempting {len(targets)} unsubscribe(s) with up to {UNSUBSCRIBE_WORKERS} in parallel...")
+        
+        def attempt(target):
+            url, sender_info, one_click = target
             try:
-                # Make GET request to unsubscribe URL
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Connection': 'close'  # Prevent connection pooling issues
-                }
-                
-                if attempt == 0:
-                    print(f"  Attempting unsubscribe from {sender_name} ({sender_email})")
-                    print(f"  URL: {url}")
-                else:
-                    print(f"  Retry attempt {attempt}/{max_retries}")
-                
-                # Add small delay between retries
-                if attempt > 0:
-                    time.sleep(1 * attempt)
-                
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    timeout=15, 
-                    allow_redirects=True,
-                    stream=False  # Don't stream to avoid connection issues
-                )
-                
-                if response.status_code == 200:
-                    print(f"  ✓ Successfully accessed unsubscribe page")
-                    response.close()  # Explicitly close the response
-                    return True
-                else:
-                    print(f"  ✗ HTTP {response.status_code} - Failed to access unsubscribe page")
-                    response.close()
-                    if attempt < max_retries:
-                        print(f"    Will retry...")
-                    
-            except requests.exceptions.Timeout as e:
-                print(f"  ✗ Request timeout (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt == max_retries:
-                    return False
-            except requests.exceptions.ConnectionError as e:
-                print(f"  ✗ Connection error (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt == max_retries:
-                    return False
-            except requests.exceptions.RequestException as e:
-                print(f"  ✗ Request failed (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt == max_retries:
-                    return False
+                # Many senders share an ESP's unsubscribe host; don't hammer it
+                with self._host_semaphore(url):
+                    return self.attempt_unsubscribe(url, sender_info, one_click=one_click)
             except Exception as e:
-                print(f"  ✗ Unexpected error (attempt {attempt + 1}/{max_retries + 1}): {e}")
-                if attempt == max_retries:
-                    return False
+                # One bad URL mustn't abort the run before results reach the history
+                self._log([f"  ✗ Unsubscribe from {sender_info[1]} failed: {e}"])
+                return False
         
-        return False
+        with ThreadPoolExecutor(max_workers=UNSUBSCRIBE_WORKERS) as executor:
+            results = executor.map(attempt, targets.values())
+            return dict(zip(targets.keys(), results))
     
-    def group_emails_by_sender(self, messages: List[Dict]) -> Dict[str, List[Dict]]:
+    def group_emails_by_sender(self, messages: List[Dict]) -> Dict[str, SenderData]:
         """
         Group emails by sender to avoid processing duplicates
         
@@ -400,86 +998,149 @@ class GmailUnsubscriber:
             messages: List of Gmail message objects
             
         Returns:
-            Dictionary mapping sender email to list of messages
+            Dictionary mapping sender key to its SenderData, in order of first appearance
         """
-        sender_groups = {}
+        sender_groups: Dict[str, SenderData] = {}
         
         print("Grouping emails by sender...")
         
+        # Only headers are needed to group; bodies are fetched later, once per sender
+        fetched = self.get_messages_batch([msg['id'] for msg in messages], fmt='metadata',
+                                          metadata_headers=METADATA_HEADERS)
+        
         for i, msg in enumerate(messages, 1):
-            print(f"  Processing email {i}/{len(messages)}...")
-            message = self.get_message_details(msg['id'])
+            self._progress(i, len(messages))
+            message = fetched.get(msg['id'])
             if not message:
                 print(f"    Failed to get message details for email {i}")
                 continue
                 
-            sender_name, sender_email = self.get_sender_info(message)
-            sender_key = sender_email.lower().strip()
+            sender_name, sender_email, sender_key = self.get_sender_info(message)
             
-            print(f"    Grouping email from: {sender_name} ({sender_email})")
+            if self.verbose:
+                print(f"    Grouping email from: {sender_name} ({sender_email})")
             
-            if sender_key not in sender_groups:
-                sender_groups[sender_key] = {
-                    'name': sender_name,
-                    'email': sender_email,
-                    'messages': []
-                }
-                print(f"    Created new group for sender: {sender_email}")
-            else:
-                print(f"    Added to existing group for: {sender_email} (total: {len(sender_groups[sender_key]['messages']) + 1} emails)")
+            group = sender_groups.get(sender_key)
+            if group is None:
+                group = sender_groups[sender_key] = SenderData(sender_name, sender_email)
+                if self.verbose:
+                    print(f"    Created new group for sender: {sender_email}")
+            elif self.verbose:
+                print(f"    Added to existing group for: {sender_email} (total: {len(group.messages) + 1} emails)")
             
-            sender_groups[sender_key]['messages'].append(message)
-        
-        # Sort by number of emails (most emails first)
-        sorted_senders = dict(sorted(sender_groups.items(), 
-                                   key=lambda x: len(x[1]['messages']), 
-                                   reverse=True))
+            group.add(message)
         
-        print(f"Found {len(sorted_senders)} unique senders")
+        print(f"Found {len(sender_groups)} unique senders")
         
         # Show top senders
         print("\nTop senders by email count:")
-        for i, (sender_key, data) in enumerate(list(sorted_senders.items())[:10], 1):
-            count = len(data['messages'])
-            print(f"  {i}. {data['name']} ({sender_key}): {count} emails")
+        top_senders = heapq.nlargest(10, sender_groups.items(),
+                                     key=lambda x: len(x[1].messages))
+        for i, (sender_key, data) in enumerate(top_senders, 1):
+            count = len(data.messages)
+            print(f"  {i}. {data.name} ({sender_key}): {count} emails")
         
-        return sorted_senders
+        return sender_groups
     
-    def label_message(self, message_id: str, label_name: str = "Unsubscribed"):
-        """Add a label to mark processed messages"""
-        try:
-            # Create label if it doesn't exist
-            labels = self.service.users().labels().list(userId='me').execute()
-            label_id = None
-            
+    def get_label_id(self, label_name: str) -> str:
+        """Look up a label by name, creating it if it doesn't exist"""
+        if label_name in self._label_cache:
+            return self._label_cache[label_name]
+        
+        if not self._labels_listed:
+            # One labels.list call fills the cache for every existing label
+            labels = self._execute(self.service.users().labels().list(userId='me'))
             for label in labels.get('labels', []):
-                if label['name'] == label_name:
-                    label_id = label['id']
-                    break
+                self._label_cache[label['name']] = label['id']
+            self._labels_listed = True
             
-            if not label_id:
-                # Create new label
-                label_object = {
-                    'name': label_name,
-                    'messageListVisibility': 'show',
-                    'labelListVisibility': 'labelShow'
-                }
-                created_label = self.service.users().labels().create(
-                    userId='me', body=label_object).execute()
-                label_id = created_label['id']
+            if label_name in self._label_cache:
+                return self._label_cache[label_name]
+        
+        # Create new label
+        label_object = {
+            'name': label_name,
+            'messageListVisibility': 'show',
+            'labelListVisibility': 'labelShow'
+        }
+        created_label = self._execute(self.service.users().labels().create(
+            userId='me', body=label_object))
+        self._label_cache[label_name] = created_label['id']
+        return created_label['id']
+    
+    def _bulk_execute(self, message_ids: List[str], make_request, action: str) -> int:
+        """
+        Run a batchModify/batchDelete request over messages, up to BATCH_MODIFY_SIZE at a time
+        
+        A chunk rejected with 400 Bad Request is split in half and each half
+        retried, down to single messages, so one oversized or bad chunk doesn't
+        fail every message in it.
+        
+        Args:
+            message_ids: List of Gmail message IDs
+            make_request: Callable building the request for a list of message IDs
+            action: What the request does (for logging), e.g. "delete"
             
-            # Add label to message
-            self.service.users().messages().modify(
-                userId='me', id=message_id,
-                body={'addLabelIds': [label_id]}
-            ).execute()
+        Returns:
+            Number of messages the request succeeded for
+        """
+        done_count = 0
+        # Stack of chunks still to send, popped in message order
+        pending = [message_ids[start:start + BATCH_MODIFY_SIZE]
+                   for start in range(0, len(message_ids), BATCH_MODIFY_SIZE)]
+        pending.reverse()
+        
+        while pending:
+            chunk = pending.pop()
+            try:
+                self._execute(make_request(chunk))
+                done_count += len(chunk)
+            except HttpError as e:
+                if e.resp.status == 400 and len(chunk) > 1:
+                    half = len(chunk) // 2
+                    print(f"    Request to {action} {len(chunk)} messages rejected, retrying in halves...")
+                    pending.append(chunk[half:])
+                    pending.append(chunk[:half])
+                else:
+                    print(f"    Warning: Could not {action} {len(chunk)} messages - {e}")
+            except Exception as e:
+                print(f"    Warning: Could not {action} {len(chunk)} messages - {e}")
+        
+        return done_count
+    
+    def label_messages(self, message_ids: List[str], label_name: str = "Unsubscribed") -> int:
+        """
+        Add a label to multiple messages using batchModify
+        
+        Args:
+            message_ids: List of Gmail message IDs to label
+            label_name: Name of the label to add
+            
+        Returns:
+            Number of successfully labeled messages
+        """
+        if not message_ids:
+            return 0
+        
+        labeled_count = 0
+        
+        try:
+            label_id = self.get_label_id(label_name)
+            
+            labeled_count = self._bulk_execute(
+                message_ids,
+                lambda chunk: self.service.users().messages().batchModify(
+                    userId='me', body={'ids': chunk, 'addLabelIds': [label_id]}),
+                "label")
             
         except Exception as e:
             print(f"  Warning: Could not add label - {e}")
+        
+        return labeled_count
     
     def delete_messages(self, message_ids: List[str], sender_name: str) -> int:
         """
-        Delete multiple messages by ID
+        Permanently delete multiple messages using batchDelete
         
         Args:
             message_ids: List of Gmail message IDs to delete
@@ -494,21 +1155,13 @@ class GmailUnsubscriber:
         deleted_count = 0
         
         try:
-            # Gmail API allows batch deletion, but we'll do it one by one for better error handling
             print(f"  Deleting {len(message_ids)} emails from {sender_name}...")
             
-            for i, message_id in enumerate(message_ids, 1):
-                try:
-                    self.rate_limit_api_call()
-                    self.service.users().messages().delete(userId='me', id=message_id).execute()
-                    deleted_count += 1
-                    
-                    # Show progress for large batches
-                    if len(message_ids) > 5 and i % 5 == 0:
-                        print(f"    Deleted {i}/{len(message_ids)} emails...")
-                        
-                except Exception as e:
-                    print(f"    Warning: Could not delete message {i} - {e}")
+            deleted_count = self._bulk_execute(
+                message_ids,
+                lambda chunk: self.service.users().messages().batchDelete(
+                    userId='me', body={'ids': chunk}),
+                "delete")
             
             print(f"  ✓ Successfully deleted {deleted_count}/{len(message_ids)} emails")
             
@@ -521,6 +1174,9 @@ class GmailUnsubscriber:
         """
         Move multiple messages to trash (safer than permanent delete)
         
+        Gmail has no batch trash endpoint, so this uses batchModify to add the
+        TRASH label and remove INBOX, which is what messages.trash does.
+        
         Args:
             message_ids: List of Gmail message IDs to trash
             sender_name: Name of sender (for logging)
@@ -536,18 +1192,12 @@ class GmailUnsubscriber:
         try:
             print(f"  Moving {len(message_ids)} emails from {sender_name} to trash...")
             
-            for i, message_id in enumerate(message_ids, 1):
-                try:
-                    self.rate_limit_api_call()
-                    self.service.users().messages().trash(userId='me', id=message_id).execute()
-                    trashed_count += 1
-                    
-                    # Show progress for large batches
-                    if len(message_ids) > 5 and i % 5 == 0:
-                        print(f"    Moved {i}/{len(message_ids)} emails to trash...")
-                        
-                except Exception as e:
-                    print(f"    Warning: Could not trash message {i} - {e}")
+            trashed_count = self._bulk_execute(
+                message_ids,
+                lambda chunk: self.service.users().messages().batchModify(
+                    userId='me',
+                    body={'ids': chunk, 'addLabelIds': ['TRASH'], 'removeLabelIds': ['INBOX']}),
+                "trash")
             
             print(f"  ✓ Successfully moved {trashed_count}/{len(message_ids)} emails to trash")
             
@@ -561,7 +1211,8 @@ class GmailUnsubscriber:
                            delete_after_unsubscribe: bool = False,
                            permanent_delete: bool = False,
                            inbox_only: bool = True,
-                           delete_without_unsubscribe: bool = True):
+                           delete_without_unsubscribe: bool = True,
+                           mailto_unsubscribe: bool = False):
         """
         Main method to find and process unsubscribe requests
         
@@ -573,6 +1224,7 @@ class GmailUnsubscriber:
             permanent_delete: If True, permanently delete (vs move to trash)
             inbox_only: If True, search only in inbox (default: True)
             delete_without_unsubscribe: If True, delete emails even when no unsubscribe link is found
+            mailto_unsubscribe: If True, send an unsubscribe email when no HTTP unsubscribe works
         """
         print(f"\n{'='*60}")
         print(f"Gmail Unsubscribe Tool - {'DRY RUN' if dry_run else 'LIVE RUN'}")
@@ -592,29 +1244,32 @@ class GmailUnsubscriber:
         # Track processed senders to avoid duplicates
         processed_senders = set()
         sender_details = {}  # Store details for summary
+        ids_to_label = []  # Labeled in one batch after the loop
+        ids_to_remove = []  # Deleted or trashed in one batch after the loop
+        
+        # Get headers for all emails up front, BATCH_SIZE per batch request; bodies are
+        # only fetched for the first email from each sender
+        fetched = self.get_messages_batch([msg['id'] for msg in messages], fmt='metadata',
+                                          metadata_headers=METADATA_HEADERS)
         
         for i, msg in enumerate(messages, 1):
-            print(f"\nProcessing email {i}/{len(messages)}...")
+            self._progress(i, len(messages))
             
-            # Get full message details
-            message = self.get_message_details(msg['id'])
+            message = fetched.get(msg['id'])
             if not message:
                 continue
             
             # Get sender information
-            sender_name, sender_email = self.get_sender_info(message)
+            sender_name, sender_email, sender_key = self.get_sender_info(message)
             
             # Check if we've already processed this sender
-            sender_key = sender_email.lower().strip()
             if sender_key in processed_senders:
-                print(f"  ⏭️  Skipping {sender_name} - already processed this sender")
+                if self.verbose:
+                    print(f"  ⏭️  Skipping {sender_name} - already processed this sender")
                 
                 if delete_after_unsubscribe and not dry_run:
                     # Move email to trash since sender was already processed
-                    if permanent_delete:
-                        self.delete_messages([msg['id']], sender_name)
-                    else:
-                        self.move_to_trash([msg['id']], sender_name)
+                    ids_to_remove.append(msg['id'])
                 elif dry_run and delete_after_unsubscribe:
                     action = "permanently delete" if permanent_delete else "move to trash"
                     print(f"  [DRY RUN] Would {action} this email from previously processed sender")
@@ -623,18 +1278,16 @@ class GmailUnsubscriber:
                 continue
             
             # Extract unsubscribe links
-            unsubscribe_links = self.extract_unsubscribe_links(message)
+            unsubscribe_links = self.find_unsubscribe_links(message)
+            mailto_links = self.extract_mailto_links(message) if mailto_unsubscribe else []
             
-            if not unsubscribe_links:
+            if not unsubscribe_links and not mailto_links:
                 print(f"  No unsubscribe links found for {sender_name}")
                 
                 # If delete_without_unsubscribe is True and delete_after_unsubscribe is True, delete anyway
                 if delete_without_unsubscribe and delete_after_unsubscribe and not dry_run:
-                    print(f"  Deleting email without unsubscribe attempt...")
-                    if permanent_delete:
-                        self.delete_messages([msg['id']], sender_name)
-                    else:
-                        self.move_to_trash([msg['id']], sender_name)
+                    print(f"  Queueing email for deletion without unsubscribe attempt...")
+                    ids_to_remove.append(msg['id'])
                 elif dry_run and delete_without_unsubscribe and delete_after_unsubscribe:
                     action = "permanently delete" if permanent_delete else "move to trash"
                     print(f"  [DRY RUN] Would {action} email without unsubscribe attempt")
@@ -642,24 +1295,32 @@ class GmailUnsubscriber:
                 continue
             
             print(f"  Found {len(unsubscribe_links)} unsubscribe link(s) for {sender_name}")
+            if mailto_links:
+                print(f"  Found {len(mailto_links)} mailto: unsubscribe address(es)")
             
             # Add sender to processed set
             processed_senders.add(sender_key)
             sender_details[sender_key] = {
                 'name': sender_name,
                 'email': sender_email,
-                'links': unsubscribe_links,
+                'links': unsubscribe_links + mailto_links,
                 'success': False
             }
             
             if dry_run:
                 print(f"  [DRY RUN] Would attempt to unsubscribe from {sender_email}")
-                for j, link in enumerate(unsubscribe_links, 1):
+                for j, link in enumerate(unsubscribe_links + mailto_links, 1):
                     print(f"    Link {j}: {link}")
                 sender_details[sender_key]['success'] = True  # Assume success for dry run
             else:
                 # Attempt to unsubscribe using the first link
-                success = self.attempt_unsubscribe(unsubscribe_links[0], (sender_name, sender_email))
+                success = False
+                if unsubscribe_links:
+                    success = self.attempt_unsubscribe(unsubscribe_links[0], (sender_name, sender_email),
+                                                       one_click=self.is_one_click_unsubscribe(message))
+                # Fall back to an unsubscribe email if HTTP didn't work
+                if not success and mailto_links:
+                    success = self.send_mailto_unsubscribe(mailto_links[0], (sender_name, sender_email))
                 sender_details[sender_key]['success'] = success
                 
                 if success:
@@ -667,17 +1328,24 @@ class GmailUnsubscriber:
                 
                 # Delete or trash the email regardless of unsubscribe success
                 if delete_after_unsubscribe:
-                    if permanent_delete:
-                        self.delete_messages([msg['id']], sender_name)
-                    else:
-                        self.move_to_trash([msg['id']], sender_name)
-                else:
+                    ids_to_remove.append(msg['id'])
+                elif success:
                     # Only label if unsubscribe was successful
-                    if success:
-                        self.label_message(msg['id'])
+                    ids_to_label.append(msg['id'])
             
             processed_count += 1
         
+        if ids_to_remove:
+            print()
+            if permanent_delete:
+                self.delete_messages(ids_to_remove, "processed senders")
+            else:
+                self.move_to_trash(ids_to_remove, "processed senders")
+        
+        if ids_to_label:
+            print(f"\nLabeling {len(ids_to_label)} emails from unsubscribed senders...")
+            self.label_messages(ids_to_label)
+        
         # Print detailed summary
         print(f"\n{'='*60}")
         print(f"DETAILED SUMMARY:")
@@ -705,7 +1373,8 @@ class GmailUnsubscriber:
                                      delete_after_unsubscribe: bool = False,
                                      permanent_delete: bool = False,
                                      inbox_only: bool = True,
-                                     delete_without_unsubscribe: bool = True):
+                                     delete_without_unsubscribe: bool = True,
+                                     mailto_unsubscribe: bool = False):
         """
         Process unsubscribes grouped by sender (more efficient)
         
@@ -717,6 +1386,7 @@ class GmailUnsubscriber:
             permanent_delete: If True, permanently delete (vs move to trash)
             inbox_only: If True, search only in inbox (default: True)
             delete_without_unsubscribe: If True, delete emails even when no unsubscribe link is found
+            mailto_unsubscribe: If True, send an unsubscribe email when no HTTP unsubscribe works
         """
         print(f"\n{'='*60}")
         action_mode = "DRY RUN" if dry_run else "LIVE RUN"
@@ -736,40 +1406,67 @@ class GmailUnsubscriber:
         # Group emails by sender
         sender_groups = self.group_emails_by_sender(messages)
         
-        processed_count = 0
-        success_count = 0
-        total_emails_affected = 0
+        # Process senders with the most emails first
+        sender_groups = dict(sorted(sender_groups.items(),
+                                    key=lambda x: len(x[1].messages),
+                                    reverse=True))
+        
+        # Find unsubscribe links for every new sender up front so that the
+        # HTTP unsubscribe requests can run concurrently
+        print("\nFinding unsubscribe links...")
+        # Senders attempted on earlier runs, fixed before this run adds to the history
+        previously_attempted = frozenset(self.unsubscribe_history)
+        sender_links = {}
+        sender_mailto_links = {}
+        sender_one_click = {}
+        for sender_key, sender_data in sender_groups.items():
+            if sender_key in previously_attempted:
+                continue
+            # Use the most recent email to find unsubscribe links
+            latest_message = sender_data.latest
+            sender_links[sender_key] = self.find_unsubscribe_links(latest_message)
+            sender_mailto_links[sender_key] = (
+                self.extract_mailto_links(latest_message) if mailto_unsubscribe else [])
+            sender_one_click[sender_key] = self.is_one_click_unsubscribe(latest_message)
+        
+        unsubscribe_results = {}
+        if not dry_run:
+            # Attempt to unsubscribe using the first link of each sender
+            unsubscribe_results = self.attempt_unsubscribes({
+                sender_key: (links[0],
+                             (sender_groups[sender_key].name, sender_groups[sender_key].email),
+                             sender_one_click[sender_key])
+                for sender_key, links in sender_links.items() if links
+            })
+        
+        stats = Counter()  # 'processed' senders, 'affected' emails, 'success'ful unsubscribes
+        n_groups = len(sender_groups)
         total_deleted = 0
+        ids_to_label = []  # Labeled in one batch after the loop
+        ids_to_remove = []  # Deleted or trashed in one batch after the loop
         
         for sender_key, sender_data in sender_groups.items():
-            sender_name = sender_data['name']
-            sender_email = sender_data['email']
-            messages_from_sender = sender_data['messages']
+            sender_name = sender_data.name
+            sender_email = sender_data.email
+            messages_from_sender = sender_data.messages
+            message_ids = tuple(msg['id'] for msg in messages_from_sender)
             
-            processed_count += 1
             email_count = len(messages_from_sender)
-            total_emails_affected += email_count
+            stats.update(processed=1, affected=email_count)
             
-            print(f"\nProcessing sender {processed_count}/{len(sender_groups)}: {sender_name}")
-            print(f"  Email count: {email_count}")
+            print(f"\nProcessing sender {stats['processed']}/{n_groups}: {sender_name} "
+                  f"({email_count} emails)")
             
             # Check if we've already attempted to unsubscribe from this sender
-            if self.is_already_unsubscribed(sender_email):
-                unsubscribe_record = self.get_unsubscribe_record(sender_email)
-                print(f"  📝 Previously attempted unsubscribe on {unsubscribe_record['timestamp'][:10]}")
-                print(f"     Status: {'Success' if unsubscribe_record['success'] else 'Failed'}")
+            if sender_key in previously_attempted:
+                unsubscribe_record = self.unsubscribe_history[sender_key]
+                print(f"  📝 Previously attempted unsubscribe on {unsubscribe_record['timestamp'][:10]} "
+                      f"({'Success' if unsubscribe_record['success'] else 'Failed'})")
                 
                 if delete_after_unsubscribe and not dry_run:
                     # Skip unsubscribe attempt, just delete/trash the emails
-                    message_ids = [msg['id'] for msg in messages_from_sender]
-                    print(f"  🗑️  Skipping unsubscribe (already attempted), proceeding to delete emails...")
-                    
-                    if permanent_delete:
-                        deleted_count = self.delete_messages(message_ids, sender_name)
-                    else:
-                        deleted_count = self.move_to_trash(message_ids, sender_name)
-                    
-                    total_deleted += deleted_count
+                    print(f"  🗑️  Skipping unsubscribe (already attempted), queueing emails for deletion...")
+                    ids_to_remove.extend(message_ids)
                 elif dry_run:
                     print(f"  [DRY RUN] Would skip unsubscribe (already attempted)")
                     if delete_after_unsubscribe:
@@ -780,89 +1477,95 @@ class GmailUnsubscriber:
                 
                 continue
             
-            # Use the most recent email to find unsubscribe links
-            latest_message = messages_from_sender[0]  # They're already sorted by recency in Gmail API
-            unsubscribe_links = self.extract_unsubscribe_links(latest_message)
+            unsubscribe_links = sender_links[sender_key]
+            mailto_links = sender_mailto_links[sender_key]
             
-            if not unsubscribe_links:
+            if not unsubscribe_links and not mailto_links:
                 print(f"  No unsubscribe links found for {sender_name}")
                 
                 # If delete_without_unsubscribe is True and delete_after_unsubscribe is True, delete anyway
                 if delete_without_unsubscribe and delete_after_unsubscribe and not dry_run:
-                    print(f"  Deleting {email_count} emails without unsubscribe attempt...")
-                    message_ids = [msg['id'] for msg in messages_from_sender]
-                    if permanent_delete:
-                        deleted_count = self.delete_messages(message_ids, sender_name)
-                    else:
-                        deleted_count = self.move_to_trash(message_ids, sender_name)
-                    total_deleted += deleted_count
+                    print(f"  Queueing {email_count} emails for deletion without unsubscribe attempt...")
+                    ids_to_remove.extend(message_ids)
                 elif dry_run and delete_without_unsubscribe and delete_after_unsubscribe:
                     action = "permanently delete" if permanent_delete else "move to trash"
                     print(f"  [DRY RUN] Would {action} {email_count} emails without unsubscribe attempt")
                 
                 continue
             
-            print(f"  Found {len(unsubscribe_links)} unsubscribe link(s)")
+            if self.verbose:
+                print(f"  Found {len(unsubscribe_links)} unsubscribe link(s)")
+                if mailto_links:
+                    print(f"  Found {len(mailto_links)} mailto: unsubscribe address(es)")
             
             if dry_run:
-                print(f"  [DRY RUN] Would attempt to unsubscribe from {sender_email}")
-                print(f"  [DRY RUN] This would affect {email_count} emails from this sender")
+                print(f"  [DRY RUN] Would attempt to unsubscribe from {sender_email}, "
+                      f"affecting {email_count} emails")
                 if delete_after_unsubscribe:
                     action = "permanently delete" if permanent_delete else "move to trash"
                     print(f"  [DRY RUN] Would {action} {email_count} emails after unsubscribe")
-                for j, link in enumerate(unsubscribe_links, 1):
+                for j, link in enumerate(unsubscribe_links + mailto_links, 1):
                     print(f"    Link {j}: {link}")
             else:
-                # Attempt to unsubscribe using the first link
-                success = self.attempt_unsubscribe(unsubscribe_links[0], (sender_name, sender_email))
+                success = unsubscribe_results.get(sender_key, False)
+                unsubscribe_url = unsubscribe_links[0] if unsubscribe_links else None
+                
+                # Fall back to an unsubscribe email if HTTP didn't work
+                if not success and mailto_links:
+                    success = self.send_mailto_unsubscribe(mailto_links[0], (sender_name, sender_email))
+                    unsubscribe_url = mailto_links[0]
                 
                 # Record the unsubscribe attempt in history
-                self.add_to_unsubscribe_history(sender_email, sender_name, success, unsubscribe_links[0])
-                print(f"  📝 Recorded unsubscribe attempt in history")
+                self.add_to_unsubscribe_history(sender_key, sender_email, sender_name, success, unsubscribe_url)
+                if self.verbose:
+                    print(f"  📝 Recorded unsubscribe attempt in history")
                 
                 if success:
-                    success_count += 1
+                    stats['success'] += 1
                 else:
                     print(f"  Failed to unsubscribe from {sender_name}")
                 
-                # Get message IDs for deletion/labeling
-                message_ids = [msg['id'] for msg in messages_from_sender]
-                
                 if delete_after_unsubscribe:
                     # Delete or trash emails regardless of unsubscribe success
-                    if permanent_delete:
-                        deleted_count = self.delete_messages(message_ids, sender_name)
-                    else:
-                        deleted_count = self.move_to_trash(message_ids, sender_name)
-                    
-                    total_deleted += deleted_count
-                else:
+                    ids_to_remove.extend(message_ids)
+                elif success:
                     # Only label if unsubscribe was successful
-                    if success:
-                        print(f"  Labeling {email_count} emails from this sender...")
-                        for message in messages_from_sender:
-                            self.label_message(message['id'])
+                    ids_to_label.extend(message_ids)
+        
+        self.flush_unsubscribe_history()
+        
+        if ids_to_remove:
+            print()
+            if permanent_delete:
+                total_deleted = self.delete_messages(ids_to_remove, "processed senders")
+            else:
+                total_deleted = self.move_to_trash(ids_to_remove, "processed senders")
+        
+        total_labeled = 0
+        if ids_to_label:
+            print(f"\nLabeling {len(ids_to_label)} emails from unsubscribed senders...")
+            total_labeled = self.label_messages(ids_to_label)
         
         # Print detailed summary
         print(f"\n{'='*60}")
         print(f"SUMMARY (Grouped by Sender):")
         print(f"{'='*60}")
         print(f"  Total emails scanned: {len(messages)}")
-        print(f"  Unique senders found: {len(sender_groups)}")
-        print(f"  Senders processed: {processed_count}")
-        print(f"  Total emails affected: {total_emails_affected}")
+        print(f"  Unique senders found: {n_groups}")
+        print(f"  Senders processed: {stats['processed']}")
+        print(f"  Total emails affected: {stats['affected']}")
         print(f"  Total emails deleted/trash: {total_deleted}")
         
         if not dry_run:
-            print(f"  Successful unsubscribes: {success_count}")
-            print(f"  Failed unsubscribes: {processed_count - success_count}")
+            print(f"  Successful unsubscribes: {stats['success']}")
+            print(f"  Failed unsubscribes: {stats['processed'] - stats['success']}")
             
             if delete_after_unsubscribe:
                 action = "deleted" if permanent_delete else "moved to trash"
                 print(f"  Emails {action}: {total_deleted}")
                 print(f"  Estimated inbox cleanup: {total_deleted} emails removed")
             else:
-                print(f"  Emails labeled: {success_count * (total_emails_affected / len(sender_groups)) if sender_groups else 0:.0f}")
+                print(f"  Emails labeled: {total_labeled}")
         
         print(f"{'='*60}")
 
@@ -930,6 +1633,11 @@ Examples:
     parser.add_argument('--no-delete-without-unsubscribe', action='store_false', dest='delete_without_unsubscribe',
                        help='Only delete/trash emails that have unsubscribe links')
     
+    # mailto: unsubscribe option
+    parser.add_argument('--mailto-unsubscribe', action='store_true',
+                       help='Send an unsubscribe email when a sender only offers a mailto: link '
+                            'or HTTP unsubscribe fails')
+    
     # Non-interactive mode
     parser.add_argument('--yes', '-y', action='store_true',
                        help='Answer yes to all prompts (non-interactive mode)')
@@ -948,7 +1656,7 @@ def main():
     
     try:
         # Initialize the unsubscriber
-        unsubscriber = GmailUnsubscriber()
+        unsubscriber = GmailUnsubscriber(verbose=args.verbose)
         
         # Determine run mode
         if args.live:
@@ -1005,32 +1713,45 @@ def main():
         else:
             print("After unsubscribe: Keep emails and add label")
         
+        if args.mailto_unsubscribe:
+            print("mailto: unsubscribe: Enabled")
+        
         if args.verbose:
             print(f"Verbose mode: Enabled")
         
         print("=" * 40)
         
+        # Sign in up front; inside processing, login errors would be caught
+        # and reported as failed searches instead of stopping the run
+        unsubscriber.authenticate()
+        
         # Process unsubscribes using chosen method
-        if args.method == 1:
-            unsubscriber.process_unsubscribes(
-                search_query=search_query,
-                max_emails=args.max_emails,
-                dry_run=dry_run,
-                delete_after_unsubscribe=delete_after_unsubscribe,
-                permanent_delete=permanent_delete,
-                inbox_only=inbox_only,
-                delete_without_unsubscribe=args.delete_without_unsubscribe
-            )
-        else:
-            unsubscriber.process_unsubscribes_by_sender(
-                search_query=search_query,
-                max_emails=args.max_emails,
-                dry_run=dry_run,
-                delete_after_unsubscribe=delete_after_unsubscribe,
-                permanent_delete=permanent_delete,
-                inbox_only=inbox_only,
-                delete_without_unsubscribe=args.delete_without_unsubscribe
-            )
+        try:
+            if args.method == 1:
+                unsubscriber.process_unsubscribes(
+                    search_query=search_query,
+                    max_emails=args.max_emails,
+                    dry_run=dry_run,
+                    delete_after_unsubscribe=delete_after_unsubscribe,
+                    permanent_delete=permanent_delete,
+                    inbox_only=inbox_only,
+                    delete_without_unsubscribe=args.delete_without_unsubscribe,
+                    mailto_unsubscribe=args.mailto_unsubscribe
+                )
+            else:
+                unsubscriber.process_unsubscribes_by_sender(
+                    search_query=search_query,
+                    max_emails=args.max_emails,
+                    dry_run=dry_run,
+                    delete_after_unsubscribe=delete_after_unsubscribe,
+                    permanent_delete=permanent_delete,
+                    inbox_only=inbox_only,
+                    delete_without_unsubscribe=args.delete_without_unsubscribe,
+                    mailto_unsubscribe=args.mailto_unsubscribe
+                )
+        finally:
+            # Keep history from a partial run, e.g. after Ctrl+C
+            unsubscriber.flush_unsubscribe_history()
         
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")